@@ -1,5 +1,53 @@
+import bisect
 import itertools
 import random
+import sys
+
+import numpy as np
+
+
+def _bits(mask, width):
+    """
+    Yields the (i, j) cell of every set bit in a bitmask
+    over a board of the given width.
+    """
+    while mask:
+        lsb = mask & -mask
+        p = lsb.bit_length() - 1
+        yield (p // width, p % width)
+        mask ^= lsb
+
+
+def _infer_pairs(cells, counts, dirty, known):
+    """
+    Infers new sentences from pairs of sentences, given as parallel lists
+    of cell bitmasks and mine counts sorted by number of cells.
+
+    Whenever the cells of one sentence are a strict subset of another's,
+    the remaining cells contain the difference of their counts. Only pairs
+    with at least one index in the sorted list dirty are compared, and
+    bitmasks already in known are skipped. Returns a dict mapping each
+    inferred bitmask to its count.
+    """
+    inferred = {}
+    n = len(cells)
+    dirty_set = set(dirty)
+    for i in range(n):
+        c1 = cells[i]
+        k1 = counts[i]
+        if i in dirty_set:
+            candidates = range(i + 1, n)
+        else:
+            candidates = dirty[bisect.bisect_right(dirty, i):]
+        for j in candidates:
+            c2 = cells[j]
+            if c1 & ~c2 or c1 == c2:
+                continue
+            diff = c2 ^ c1
+            if diff in known or diff in inferred:
+                continue
+            inferred[diff] = counts[j] - k1
+    return inferred
 
 
 class Minesweeper():
@@ -12,45 +60,39 @@ class Minesweeper():
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
         # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        self.board = np.zeros((height, width), dtype=np.bool_)
 
         # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        flat = random.sample(range(height * width), mines)
+        self.board.flat[flat] = True
+        self.mines = {divmod(k, width) for k in flat}
 
         # At first, player has found no mines
         self.mines_found = set()
 
+        # Nearby mine counts of every cell, computed on first use
+        self._counts = None
+
     def print(self):
         """
         Prints a text-based representation
         of where mines are located.
         """
+        sep = "--" * self.width + "-\n"
+        rows = []
         for i in range(self.height):
-            print("--" * self.width + "-")
-            for j in range(self.width):
-                if self.board[i][j]:
-                    print("|X", end="")
-                else:
-                    print("| ", end="")
-            print("|")
-        print("--" * self.width + "-")
+            rows.append(sep)
+            rows.append("".join(
+                "|X" if self.board[i, j] else "| " for j in range(self.width)
+            ) + "|\n")
+        rows.append(sep)
+        sys.stdout.write("".join(rows))
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i, j])
 
     def nearby_mines(self, cell):
         """
@@ -59,23 +101,23 @@ class Minesweeper():
         not including the cell itself.
         """
 
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
+        i, j = cell
+        if self._counts is None:
+            self._counts = self.all_nearby_mines()
+        return int(self._counts[i, j])
 
-        return count
+    def all_nearby_mines(self):
+        """
+        Returns an array with the number of mines
+        within one row and column of every cell,
+        not including the cell itself.
+        """
+        padded = np.pad(self.board, 1).astype(np.int8)
+        counts = sum(
+            padded[di:di + self.height, dj:dj + self.width]
+            for di, dj in itertools.product(range(3), repeat=2)
+        )
+        return counts - self.board
 
     def won(self):
         """
@@ -89,51 +131,74 @@ class Sentence():
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+
+    The cells are stored as an integer bitmask, where the cell (i, j)
+    of a board of width W is the bit 1 << (i * W + j).
     """
 
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        self.cells = cells
         self.count = count
 
+        # Known mines and safes, recomputed only after the sentence changes
+        self._cache = (0, 0)
+        self._dirty = True
+
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{self.cells:#b} = {self.count}"
+
+    def _known(self):
+        """
+        Returns the bitmasks of known mines and known safes,
+        recomputing them if the sentence changed since the last call.
+        """
+        if self._dirty:
+            mines = self.cells if self.cells.bit_count() == self.count else 0
+            safes = self.cells if self.count == 0 else 0
+            self._cache = (mines, safes)
+            self._dirty = False
+        return self._cache
 
     def known_mines(self):
         """
-        Returns the set of all cells in self.cells known to be mines.
+        Returns the bitmask of all cells in self.cells known to be mines.
         """
-        if len(self.cells)==self.count:
-            return self.cells.copy()
-        return set()
-    
+        return self._known()[0]
+
     def known_safes(self):
         """
-        Returns the set of all cells in self.cells known to be safe.
+        Returns the bitmask of all cells in self.cells known to be safe.
         """
-        if self.count==0:
-            return self.cells.copy()
-        return set()
-        
-    def mark_mine(self, cell):
+        return self._known()[1]
+
+    def mark_mine(self, bit):
         """
         Updates internal knowledge representation given the fact that
         a cell is known to be a mine.
+        Returns True if this left the sentence without cells.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
-            self.count-=1
-        
-    def mark_safe(self, cell):
+        if self.cells & bit:
+            self.cells ^= bit
+            self.count -= 1
+            self._dirty = True
+            return not self.cells
+        return False
+
+    def mark_safe(self, bit):
         """
         Updates internal knowledge representation given the fact that
         a cell is known to be safe.
+        Returns True if this left the sentence without cells.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
-            
+        if self.cells & bit:
+            self.cells ^= bit
+            self._dirty = True
+            return not self.cells
+        return False
+
 
 class MinesweeperAI():
     """
@@ -146,33 +211,100 @@ class MinesweeperAI():
         self.height = height
         self.width = width
 
-        # Keep track of which cells have been clicked on
-        self.moves_made = set()
+        # Keep track of which cells have been clicked on, and of cells
+        # known to be safe or mines, as bitmasks
+        self.moves_made = 0
+        self.mines = 0
+        self.safes = 0
+
+        # Cells not yet clicked on nor known to be mines, kept both as a
+        # list for uniform sampling and as a map to each cell's position
+        self._available = [
+            (i, j) for i in range(self.height) for j in range(self.width)
+        ]
+        self._available_index = {
+            cell: k for k, cell in enumerate(self._available)
+        }
 
-        # Keep track of cells known to be safe or mines
-        self.mines = set()
-        self.safes = set()
+        # Known safe cells that have not been clicked on yet
+        self._safe_unplayed = 0
 
         # List of sentences about the game known to be true
         self.knowledge = []
 
+        # Sentences left without cells, to remove from the knowledge base
+        self._to_drop = []
+
+        # Cells of every sentence in the knowledge base, mapped to its count
+        self._sentence_index = {}
+
+        # Cells of every sentence already compared by apply_inference
+        self._swept = set()
+
+        # Bit that represents each cell in bitmasks, and bitmask of the
+        # in-bounds neighbors of each cell, computed once per board
+        self._bit = [
+            [1 << (i * self.width + j) for j in range(self.width)]
+            for i in range(self.height)
+        ]
+        self._neighbor_mask = [
+            [
+                sum(
+                    self._bit[ni][nj]
+                    for ni in range(max(0, i - 1), min(self.height, i + 2))
+                    for nj in range(max(0, j - 1), min(self.width, j + 2))
+                    if (ni, nj) != (i, j)
+                )
+                for j in range(self.width)
+            ]
+            for i in range(self.height)
+        ]
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.mines.add(cell)
+        i, j = cell
+        bit = self._bit[i][j]
+        self.mines |= bit
+        self._discard_available(cell)
         for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+            if sentence.mark_mine(bit):
+                self._to_drop.append(sentence)
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
-        self.safes.add(cell)
+        i, j = cell
+        bit = self._bit[i][j]
+        self.safes |= bit
+        if not self.moves_made & bit:
+            self._safe_unplayed |= bit
         for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+            if sentence.mark_safe(bit):
+                self._to_drop.append(sentence)
+
+    def _discard_available(self, cell):
+        """
+        Removes a cell from the available moves by swapping it
+        with the last one and popping.
+        """
+        k = self._available_index.pop(cell, None)
+        if k is None:
+            return
+        last = self._available.pop()
+        if last != cell:
+            self._available[k] = last
+            self._available_index[last] = k
+
+    def mine_cells(self):
+        """
+        Returns the set of all cells known to be mines.
+        """
+        return set(_bits(self.mines, self.width))
 
     def add_knowledge(self, cell, count):
 
@@ -183,58 +315,77 @@ class MinesweeperAI():
         This function should:
         """
             #1) mark the cell as a move that has been made
-        self.moves_made.add(cell)
+        i, j = cell
+        bit = self._bit[i][j]
+        self.moves_made |= bit
+        self._safe_unplayed &= ~bit
+        self._discard_available(cell)
             #2) mark the cell as safe
         self.mark_safe(cell)
             #3) add a new sentence to the AI's knowledge base based on the value of `cell` and `count`
-        neighbors = set()
-        for i in range(cell[0] - 1, cell[0] + 2): 
-            for j in range(cell[1] - 1, cell[1] + 2): 
-                if (i, j) != cell and 0 <= i < self.height and 0 <= j < self.width:
-                    if (i, j) not in self.safes and (i, j) not in self.mines:
-                        neighbors.add((i, j))
-            
+        all_neighbors = self._neighbor_mask[i][j]
+        neighbors = all_neighbors & ~self.safes & ~self.mines
+        count -= (all_neighbors & self.mines).bit_count()
             #4) mark any additional cells as safe or as mines
-        new_sentence = Sentence(neighbors, count)
-        self.knowledge.append(new_sentence)    
+        if neighbors:
+            new_sentence = Sentence(neighbors, count)
+            self.knowledge.append(new_sentence)
+            self._sentence_index[new_sentence.cells] = new_sentence.count
             #5) add any new sentences to the AI's knowledge base
-        self.apply_inference()      
-    def apply_inference(self):
-        
-        new_knowledge = []
+        self.apply_inference()
 
-       
-        for sentence in self.knowledge:
-            mines = sentence.known_mines()
-            safes = sentence.known_safes()
-
-            for mine in mines:
-                self.mark_mine(mine)
-            for safe in safes:
-                self.mark_safe(safe)
-
-        
-        self.knowledge = [s for s in self.knowledge if len(s.cells) > 0]
-
-        
-        for s1 in self.knowledge:
-            for s2 in self.knowledge:
-                if s1 != s2 and s1.cells.issubset(s2.cells):
-                    inferred_cells = s2.cells - s1.cells
-                    inferred_count = s2.count - s1.count
-                    new_sentence = Sentence(inferred_cells, inferred_count)
-                    if new_sentence not in self.knowledge:
-                        new_knowledge.append(new_sentence)
-
-       
-        self.knowledge.extend(new_knowledge)    
-       
+    def apply_inference(self):
+        """
+        Marks every cell the knowledge base implies is a mine or safe,
+        and adds sentences inferred from pairs of sentences, repeating
+        until no new mine, safe or sentence turns up.
+        """
+        changed = True
+        while changed:
+            changed = False
+
+            for sentence in list(self.knowledge):
+                mines = sentence.known_mines()
+                safes = sentence.known_safes()
+                if mines or safes:
+                    changed = True
+
+                for mine in _bits(mines, self.width):
+                    self.mark_mine(mine)
+                for safe in _bits(safes, self.width):
+                    self.mark_safe(safe)
+
+            # Drop the sentences that marking cells left empty
+            if self._to_drop:
+                drop = {id(s) for s in self._to_drop}
+                self.knowledge = [
+                    s for s in self.knowledge if id(s) not in drop
+                ]
+                self._to_drop.clear()
+
+            # Marking cells above changed sentence contents, so re-key the index
+            self._sentence_index = {s.cells: s.count for s in self.knowledge}
+
+            # Only a sentence at most as large as another can be its subset,
+            # so compare each sentence against the larger ones that follow it.
+            # Pairs of sentences already compared in an earlier pass are
+            # skipped: only pairs with a new or modified sentence can yield
+            # something new.
+            sents = sorted(self.knowledge, key=lambda s: s.cells.bit_count())
+            cells = [s.cells for s in sents]
+            counts = [s.count for s in sents]
+            dirty = [i for i, c in enumerate(cells) if c not in self._swept]
+            inferred = _infer_pairs(cells, counts, dirty, self._sentence_index)
+            self._sentence_index.update(inferred)
+            new_knowledge = [Sentence(c, k) for c, k in inferred.items()]
+            self._swept = set(cells)
+
+            if new_knowledge:
+                changed = True
+                self.knowledge.extend(new_knowledge)
 
     def make_safe_move(self):
-            for cell in self.safes:
-                if cell not in self.moves_made:
-                    return cell
-            return None
+            return next(_bits(self._safe_unplayed, self.width), None)
 
     def make_random_move(self):
         """
@@ -243,63 +394,65 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
      """
-        available_moves = [
-            (i, j) for i in range(self.height) for j in range(self.width)
-            
-            if (i, j) not in self.moves_made and (i, j) not in self.mines
-        ]
-        return random.choice(available_moves) if available_moves else None
-        
-
-
-# tester la class sentence 
-s = Sentence({(0, 1), (1, 1), (2, 1)}, 1)
-print("   cells:", s.cells)
-print("   count:", s.count)
-print("   known mines:", s.known_mines()) 
-print("   known safes:", s.known_safes())
-
-s.mark_mine((1, 1))
-print("   cells:", s.cells)
-print("   count:", s.count)
-print("   known mines:", s.known_mines()) 
-print("   known safes:", s.known_safes()) 
-
-s.mark_safe((0, 0))
-print("   cells:", s.cells)
-print("   count:", s.count)
-print("   known mines:", s.known_mines()) 
-print("   known safes:", s.known_safes()) 
-
-sentence2 = Sentence({(3, 1), (4, 1), (5, 1)}, 3) 
-
-print("known mines:", sentence2.known_mines())  
-
-# Tester add_knowledge
-ai = MinesweeperAI(height=8, width=8)
-ai.add_knowledge((4, 4), 1)
-print("Connaissances après ajout de la cellule (4, 4) avec 1 mine voisine:")
-for sentence in ai.knowledge:
-    print(sentence)
-ai.add_knowledge((2, 2), 0)
-print("\nConnaissances après ajout de la cellule (2, 2) avec 0 mines voisines:")
-for sentence in ai.knowledge:
-    print(sentence)
-ai.add_knowledge((1, 1), 2)
-print("\nConnaissances après ajout de la cellule (1, 1) avec 2 mines voisines:")
-for sentence in ai.knowledge:
-    print(sentence)
-
-
-ai = MinesweeperAI(height=8, width=8)
-ai.safes = {(2, 2), (3, 3), (4, 4)}
-ai.moves_made = {(2, 2)} 
-
-# Tester make_safe_move
-safe_move = ai.make_safe_move()
-print(f"Prochain coup sûr : {safe_move}")  
-ai.mines = {(1, 1), (4, 4)}
-
-# Tester make_random_move
-random_move = ai.make_random_move()
-print(f"Prochain coup aléatoire : {random_move}")  
+        if not self._available:
+            return None
+        return random.choice(self._available)
+
+
+if __name__ == "__main__":
+    # tester la class sentence
+    def bit(i, j, width=8):
+        return 1 << (i * width + j)
+
+    s = Sentence(bit(0, 1) | bit(1, 1) | bit(2, 1), 1)
+    print("   cells:", s.cells)
+    print("   count:", s.count)
+    print("   known mines:", s.known_mines())
+    print("   known safes:", s.known_safes())
+
+    s.mark_mine(bit(1, 1))
+    print("   cells:", s.cells)
+    print("   count:", s.count)
+    print("   known mines:", s.known_mines())
+    print("   known safes:", s.known_safes())
+
+    s.mark_safe(bit(0, 0))
+    print("   cells:", s.cells)
+    print("   count:", s.count)
+    print("   known mines:", s.known_mines())
+    print("   known safes:", s.known_safes())
+
+    sentence2 = Sentence(bit(3, 1) | bit(4, 1) | bit(5, 1), 3)
+
+    print("known mines:", sentence2.known_mines())
+
+    # Tester add_knowledge
+    ai = MinesweeperAI(height=8, width=8)
+    ai.add_knowledge((4, 4), 1)
+    print("Connaissances après ajout de la cellule (4, 4) avec 1 mine voisine:")
+    for sentence in ai.knowledge:
+        print(sentence)
+    ai.add_knowledge((2, 2), 0)
+    print("\nConnaissances après ajout de la cellule (2, 2) avec 0 mines voisines:")
+    for sentence in ai.knowledge:
+        print(sentence)
+    ai.add_knowledge((1, 1), 2)
+    print("\nConnaissances après ajout de la cellule (1, 1) avec 2 mines voisines:")
+    for sentence in ai.knowledge:
+        print(sentence)
+
+
+    ai = MinesweeperAI(height=8, width=8)
+    ai.moves_made = bit(2, 2)
+    for cell in [(2, 2), (3, 3), (4, 4)]:
+        ai.mark_safe(cell)
+
+    # Tester make_safe_move
+    safe_move = ai.make_safe_move()
+    print(f"Prochain coup sûr : {safe_move}")
+    ai.mark_mine((1, 1))
+    ai.mark_mine((4, 4))
+
+    # Tester make_random_move
+    random_move = ai.make_random_move()
+    print(f"Prochain coup aléatoire : {random_move}")